@@ -5,6 +5,7 @@ import logging
 from datetime import datetime, timedelta
 
 from ..services import geocoding_service
+from ..services.tracing import span
 from .weather_agent import WeatherAgent
 from .places_agent import PlacesAgent
 
@@ -16,45 +17,82 @@ class ParentAgent:
     Main orchestrator agent that handles user queries and coordinates child agents.
     """
 
+    # Explicit references to the location of an earlier turn
+    BACK_REFERENCE_PATTERN = (
+        r"\b(?:(?:visit|see|do|go|going|travel|stay|eat)\s+there"
+        r"|(?:that|this|the\s+same|same)\s+(?:city|place|town|country))\b"
+    )
+
+    # Words after "in"/"at" that name a time rather than a place
+    TIME_WORDS = {
+        "morning", "afternoon", "evening", "night", "tonight", "today", "tomorrow",
+        "weekend", "week", "month", "year", "summer", "winter", "spring", "autumn",
+        "fall", "january", "february", "march", "april", "may", "june", "july",
+        "august", "september", "october", "november", "december"
+    }
+
     def __init__(self):
         self.weather_agent = WeatherAgent()
         self.places_agent = PlacesAgent()
         self.cache = {}  # Simple in-memory cache
         self.cache_ttl = timedelta(hours=1)  # Cache for 1 hour
+        # Hourly forecast series is refreshed twice a day
+        self.forecast_ttl = timedelta(hours=12)
 
-    async def process_query(self, user_message: str) -> Dict[str, Any]:
+    async def process_query(self, user_message: str,
+                            session: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Process a user query and return a structured response.
 
         Args:
             user_message: The user's natural language query
+            session: Mutable conversation state; follow-up questions reuse the
+                location resolved by earlier turns
 
         Returns:
             Dict containing reply and optional structured data
         """
         try:
+            session_location = session.get("location_info") if session else None
+
             # Extract location from message
-            location = self._extract_location(user_message)
-            if not location:
+            with span("parent.extract_location") as trace_span:
+                if session_location:
+                    # Only an explicitly named place moves the conversation elsewhere
+                    location = self._extract_new_location(user_message)
+                else:
+                    location = self._extract_location(user_message)
+                # Truncated like the logged message, since traces may be sampled to disk
+                trace_span.set(location=location[:100] if location else location)
+
+            if session_location and not location:
+                # "What can I visit there?" refers to the previous location
+                location_info = session_location
+            elif not location:
                 return {
                     "reply": "I couldn't find a location in your message. Could you please mention a place you'd like to visit?",
                     "location_info": None,
                     "weather_data": None,
                     "places_data": None
                 }
-
-            # Get coordinates for the location
-            location_info = await self._get_cached_location_info(location)
-            if not location_info:
-                return {
-                    "reply": f"I don't know if '{location}' exists or I'm not sure about this place. Could you please recheck the name?",
-                    "location_info": None,
-                    "weather_data": None,
-                    "places_data": None
-                }
+            else:
+                # Get coordinates for the location
+                location_info = await self._get_cached_location_info(location)
+                if not location_info:
+                    return {
+                        "reply": f"I don't know if '{location}' exists or I'm not sure about this place. Could you please recheck the name?",
+                        "location_info": None,
+                        "weather_data": None,
+                        "places_data": None
+                    }
+
+            if session is not None:
+                session["location_info"] = location_info
 
             # Determine intent
-            intent = self._classify_intent(user_message)
+            with span("parent.classify_intent") as trace_span:
+                intent = self._classify_intent(user_message)
+                trace_span.set(**intent)
 
             # Execute based on intent
             weather_data = None
@@ -67,8 +105,9 @@ class ParentAgent:
                 places_data = await self._get_cached_places(location_info["lat"], location_info["lon"])
 
             # Format response
-            reply = self._format_response(
-                intent, location_info, weather_data, places_data)
+            with span("parent.format_response"):
+                reply = self._format_response(
+                    intent, location_info, weather_data, places_data)
 
             return {
                 "reply": reply,
@@ -78,7 +117,7 @@ class ParentAgent:
             }
 
         except Exception as e:
-            logger.error(f"Error processing query '{user_message}': {str(e)}")
+            logger.error("Error processing query '%.100s': %s", user_message, e)
             return {
                 "reply": "Sorry, I encountered an error while processing your request. Please try again.",
                 "location_info": None,
@@ -86,24 +125,34 @@ class ParentAgent:
                 "places_data": None
             }
 
-    def _extract_location(self, message: str) -> Optional[str]:
+    def _extract_location(self, message: str, strict: bool = False) -> Optional[str]:
         """
         Extract location name from user message.
         Uses simple regex patterns to find location mentions.
+        With strict=True only explicit phrases like "visit X" or "in X" count.
         """
         # Common patterns for mentioning locations
         patterns = [
             r"(?:going?\s+to|visit(?:ing)?|travel(?:ing)?\s+to|trip\s+to)\s+([A-Za-z\s,]+?)(?:\s*[,.?!]|$)",
             r"(?:tourist\s+attractions\s+in|attractions\s+in|places\s+in)\s+([A-Za-z\s,]+?)(?:\s*[,.?!]|$)",
             r"(?:weather\s+in|temperature\s+in)\s+([A-Za-z\s,]+?)(?:\s*[,.?!]|$)",
-            r"(?:in|at)\s+([A-Za-z\s,]+?)(?:\s*[,.?!]|$)",
-            r"([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)",  # Capitalized words
         ]
+        if strict:
+            # Lookahead so "at night in Rome" also yields the later "Rome"
+            patterns.append(r"\b(?:in|at)\s+(?=([A-Za-z\s,]+?)(?:\s*[,.?!]|$))")
+        else:
+            patterns += [
+                r"(?:in|at)\s+([A-Za-z\s,]+?)(?:\s*[,.?!]|$)",
+                r"([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)",  # Capitalized words
+            ]
 
         for pattern in patterns:
             matches = re.findall(pattern, message, re.IGNORECASE)
             for match in matches:
                 location = match.strip()
+                if strict:
+                    # "visit in Rome" names Rome
+                    location = re.sub(r"^(?:in|at)\s+", "", location, flags=re.IGNORECASE)
                 # Filter out common non-location words
                 excluded_words = [
                     "going", "visit", "trip", "travel", "temperature", "weather",
@@ -111,6 +160,9 @@ class ParentAgent:
                     "are", "can", "i", "tourist", "attractions", "these", "those",
                     "many", "some", "all", "most", "best", "good", "great"
                 ]
+                if strict and self._is_time_phrase(location):
+                    # "there in the evening" names a time, not a place
+                    continue
                 if location.lower() not in excluded_words and len(location) > 1:
                     # Clean up the location name
                     location = re.sub(r'\s+', ' ', location).strip()
@@ -118,6 +170,24 @@ class ParentAgent:
 
         return None
 
+    def _extract_new_location(self, message: str) -> Optional[str]:
+        """
+        Extract a place explicitly named in a follow-up message.
+
+        References back to the conversation's location ("visit there",
+        "that city", "same place") are dropped first, and only explicit
+        phrases like "in X" count, so "How hot is it there?" names no place.
+        """
+        remainder = re.sub(self.BACK_REFERENCE_PATTERN, "", message, flags=re.IGNORECASE)
+        return self._extract_location(remainder, strict=True)
+
+    def _is_time_phrase(self, phrase: str) -> bool:
+        """Check if a phrase like "the evening" or "summer" names a time"""
+        words = phrase.lower().split()
+        if words and words[0] in ("the", "this", "next", "a"):
+            words = words[1:]
+        return bool(words) and words[0] in self.TIME_WORDS
+
     def _classify_intent(self, message: str) -> Dict[str, bool]:
         """
         Classify the user's intent based on keywords in the message.
@@ -157,55 +227,82 @@ class ParentAgent:
         """Get location info with caching"""
         cache_key = f"location:{location.lower()}"
 
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if datetime.now() - timestamp < self.cache_ttl:
-                return cached_data
-
-        # Fetch fresh data
-        location_info = await geocoding_service.get_coordinates(location)
-        if location_info:
-            location_data = {
-                # Get city name
-                "name": location_info["display_name"].split(",")[0],
-                "country": location_info["country"],
-                "lat": location_info["lat"],
-                "lon": location_info["lon"]
-            }
-            self.cache[cache_key] = (location_data, datetime.now())
-            return location_data
+        with span("parent.location", cache="miss") as trace_span:
+            if cache_key in self.cache:
+                cached_data, timestamp = self.cache[cache_key]
+                if datetime.now() - timestamp < self.cache_ttl:
+                    trace_span.set(cache="hit")
+                    return cached_data
+
+            # Fetch fresh data
+            location_info = await geocoding_service.get_coordinates(location)
+            if location_info:
+                location_data = {
+                    # Get city name
+                    "name": location_info["display_name"].split(",")[0],
+                    "country": location_info["country"],
+                    "lat": location_info["lat"],
+                    "lon": location_info["lon"]
+                }
+                self.cache[cache_key] = (location_data, datetime.now())
+                return location_data
 
         return None
 
     async def _get_cached_weather(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
-        """Get weather data with caching"""
-        cache_key = f"weather:{lat:.2f},{lon:.2f}"
+        """Get current weather derived from the cached hourly forecast"""
+        cached = await self._get_cached_forecast(lat, lon)
+        if not cached:
+            return None
+
+        forecast, fetched_at = cached
+        weather_data = self.weather_agent.get_conditions_at(forecast)
+        current_hour = datetime.now().replace(minute=0, second=0, microsecond=0)
+        if weather_data is None and fetched_at < current_hour:
+            # Series fetched in an earlier hour no longer covers this one, refetch
+            # once; a series fetched this hour is kept even if it lacks the hour
+            cached = await self._get_cached_forecast(lat, lon, refresh=True)
+            if cached:
+                weather_data = self.weather_agent.get_conditions_at(cached[0])
 
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if datetime.now() - timestamp < timedelta(minutes=30):  # Weather cache for 30 min
-                return cached_data
+        return weather_data
 
-        # Fetch fresh data
-        weather_data = await self.weather_agent.get_weather(lat, lon)
-        if weather_data:
-            self.cache[cache_key] = (weather_data, datetime.now())
+    async def _get_cached_forecast(self, lat: float, lon: float,
+                                   refresh: bool = False) -> Optional[Tuple[Dict[str, Any], datetime]]:
+        """Get the hourly forecast series and its fetch time with caching"""
+        cache_key = f"forecast:{lat:.2f},{lon:.2f}"
+
+        with span("parent.forecast", cache="miss") as trace_span:
+            if not refresh and cache_key in self.cache:
+                cached_data, timestamp = self.cache[cache_key]
+                if datetime.now() - timestamp < self.forecast_ttl:
+                    trace_span.set(cache="hit")
+                    return cached_data, timestamp
+
+            # Fetch fresh data
+            forecast = await self.weather_agent.get_forecast(lat, lon)
+            if forecast:
+                fetched_at = datetime.now()
+                self.cache[cache_key] = (forecast, fetched_at)
+                return forecast, fetched_at
 
-        return weather_data
+        return None
 
     async def _get_cached_places(self, lat: float, lon: float) -> Optional[List[Dict[str, Any]]]:
         """Get places data with caching"""
         cache_key = f"places:{lat:.2f},{lon:.2f}"
 
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if datetime.now() - timestamp < self.cache_ttl:
-                return cached_data
-
-        # Fetch fresh data
-        places_data = await self.places_agent.get_places(lat, lon)
-        if places_data:
-            self.cache[cache_key] = (places_data, datetime.now())
+        with span("parent.places", cache="miss") as trace_span:
+            if cache_key in self.cache:
+                cached_data, timestamp = self.cache[cache_key]
+                if datetime.now() - timestamp < self.cache_ttl:
+                    trace_span.set(cache="hit")
+                    return cached_data
+
+            # Fetch fresh data
+            places_data = await self.places_agent.get_places(lat, lon)
+            if places_data:
+                self.cache[cache_key] = (places_data, datetime.now())
 
         return places_data
 
@@ -1,15 +1,45 @@
 import httpx
-from typing import List, Dict, Any, Optional
+import re
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 
+import numpy as np
+
+from ..services.tracing import span
+
 logger = logging.getLogger(__name__)
 
+EARTH_RADIUS_M = 6371000.0
+
 
 class PlacesAgent:
     """Agent responsible for fetching tourist attractions and places of interest"""
 
     OVERPASS_URL = "https://overpass-api.de/api/interpreter"
 
+    # Relevance ranking configuration
+    CATEGORY_WEIGHTS = {
+        "Tourist Attraction": 1.0,
+        "Museum/Gallery": 1.0,
+        "Historical Site": 0.9,
+        "Viewpoint": 0.8,
+        "Entertainment": 0.7,
+        "Park/Garden": 0.6,
+        "Nature Reserve": 0.6,
+        "Religious Site": 0.5,
+        "Point of Interest": 0.3,
+    }
+    RICHNESS_WEIGHTS = {
+        "wikipedia": 1.0,
+        "wikidata": 1.0,
+        "website": 0.25,
+        "opening_hours": 0.25,
+        "image": 0.25,
+    }
+    DISTANCE_SCALE_M = 2000.0  # Score halves at this distance from the query point
+    DEDUPE_DISTANCE_M = 50.0  # Places closer than this are the same feature
+    RANKING_POOL_SIZE = 50  # Candidates fully sorted before deduplication
+
     def __init__(self):
         self.session = httpx.AsyncClient(timeout=15.0)
 
@@ -56,32 +86,39 @@ class PlacesAgent:
             # Try different radii - start small for cities, expand for countries
             radii = [5000, 20000, 50000]  # 5km, 20km, 50km
 
-            for radius in radii:
-                query = self._build_overpass_query(lat, lon, radius)
-
-                response = await self.session.post(
-                    self.OVERPASS_URL,
-                    data=query,
-                    headers={"Content-Type": "application/x-www-form-urlencoded"}
-                )
-
-                if response.status_code == 200:
-                    data = response.json()
-                    places = self._process_overpass_results(data)
-
-                    # If we found places, return them
-                    if places and len(places) > 0:
-                        return places
-
-                # If this radius didn't work, try the next one
-                continue
+            with span("places.overpass") as trace_span:
+                for attempt, radius in enumerate(radii):
+                    trace_span.set(retries=attempt, radius=radius)
+                    query = self._build_overpass_query(lat, lon, radius)
+
+                    with span("places.overpass.request", radius=radius) as request_span:
+                        response = await self.session.post(
+                            self.OVERPASS_URL,
+                            data=query,
+                            headers={"Content-Type": "application/x-www-form-urlencoded"}
+                        )
+                        request_span.set(status=response.status_code,
+                                         bytes=len(response.content))
+
+                    if response.status_code == 200:
+                        with span("places.parse"):
+                            data = response.json()
+                        with span("places.rank", elements=len(data.get("elements", []))):
+                            places = self._process_overpass_results(data, lat, lon)
+
+                        # If we found places, return them
+                        if places and len(places) > 0:
+                            return places
+
+                    # If this radius didn't work, try the next one
+                    continue
 
             logger.warning(
-                f"No places data found for coordinates: {lat}, {lon}")
+                "No places data found for coordinates: %s, %s", lat, lon)
             return None
 
         except Exception as e:
-            logger.error(f"Places API error for {lat}, {lon}: {str(e)}")
+            logger.error("Places API error for %s, %s: %s", lat, lon, e)
             return None
 
     def _get_best_name(self, tags: Dict[str, str]) -> Optional[str]:
@@ -111,9 +148,11 @@ class PlacesAgent:
 
         return None
 
-    def _process_overpass_results(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Process Overpass API results into structured data"""
+    def _process_overpass_results(self, data: Dict[str, Any], lat: float, lon: float,
+                                  limit: int = 5) -> List[Dict[str, Any]]:
+        """Process Overpass API results into ranked, structured data"""
         places = []
+        richness = []
         elements = data.get("elements", [])
 
         for element in elements:
@@ -128,30 +167,115 @@ class PlacesAgent:
 
             # Get coordinates
             if element.get("type") == "node":
-                lat, lon = element.get("lat"), element.get("lon")
+                place_lat, place_lon = element.get("lat"), element.get("lon")
             else:
                 # For ways, use center
                 center = element.get("center", {})
-                lat, lon = center.get("lat"), center.get("lon")
+                place_lat, place_lon = center.get("lat"), center.get("lon")
 
             places.append({
                 "name": name,
                 "category": category,
-                "lat": lat,
-                "lon": lon
+                "lat": place_lat,
+                "lon": place_lon
             })
+            richness.append(
+                sum(weight for tag, weight in self.RICHNESS_WEIGHTS.items() if tag in tags))
+
+        if not places:
+            return []
 
-        # Remove duplicates and limit to 5
+        scores = self._score_places(places, richness, lat, lon)
+        selected: List[Dict[str, Any]] = []
         seen = set()
-        unique_places = []
-        for place in places:
-            if place["name"] not in seen:
-                seen.add(place["name"])
-                unique_places.append(place)
-                if len(unique_places) >= 5:
-                    break
-
-        return unique_places
+
+        # Only a small pool is ordered; the remaining candidates are ranked
+        # only if deduplication exhausts the pool before reaching the limit
+        candidates = np.arange(len(places))
+        pool = self.RANKING_POOL_SIZE
+        while len(candidates) > 0 and len(selected) < limit:
+            top, candidates = self._partial_sort(scores, candidates, pool)
+            self._select_unique(places, top, limit, selected, seen)
+            pool *= 4
+
+        return selected
+
+    def _score_places(self, places: List[Dict[str, Any]], richness: List[float],
+                      lat: float, lon: float) -> np.ndarray:
+        """
+        Score all candidate places at once.
+
+        The score combines the category weight and tag richness, decayed by
+        haversine distance to the query point. Places without coordinates
+        score lowest.
+        """
+        lats = np.array([p["lat"] if p["lat"] is not None else np.nan for p in places],
+                        dtype=float)
+        lons = np.array([p["lon"] if p["lon"] is not None else np.nan for p in places],
+                        dtype=float)
+        category_weights = np.array(
+            [self.CATEGORY_WEIGHTS.get(p["category"], 1.0) for p in places])
+
+        distances = self._haversine(lat, lon, lats, lons)
+        decay = 1.0 / (1.0 + distances / self.DISTANCE_SCALE_M)
+        return np.nan_to_num(
+            category_weights * (1.0 + np.asarray(richness)) * decay, nan=-1.0)
+
+    @staticmethod
+    def _partial_sort(scores: np.ndarray, candidates: np.ndarray,
+                      k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Split candidates into the k best, sorted best first, and the unsorted rest.
+        """
+        if k < len(candidates):
+            partition = np.argpartition(-scores[candidates], k - 1)
+            top, rest = candidates[partition[:k]], candidates[partition[k:]]
+        else:
+            top, rest = candidates, candidates[:0]
+
+        return top[np.argsort(-scores[top], kind="stable")], rest
+
+    def _select_unique(self, places: List[Dict[str, Any]], order: np.ndarray, limit: int,
+                       selected: List[Dict[str, Any]], seen: set) -> None:
+        """Add places in rank order to selected, skipping duplicate names and features"""
+        for index in order:
+            if len(selected) >= limit:
+                break
+
+            place = places[index]
+            key = self._normalize_name(place["name"])
+            if key in seen or self._is_near_selected(place, selected):
+                continue
+
+            seen.add(key)
+            selected.append(place)
+
+    def _is_near_selected(self, place: Dict[str, Any], selected: List[Dict[str, Any]]) -> bool:
+        """Check if a place is the same feature as an already selected one"""
+        if place["lat"] is None or place["lon"] is None or not selected:
+            return False
+
+        lats = np.array([p["lat"] if p["lat"] is not None else np.nan for p in selected],
+                        dtype=float)
+        lons = np.array([p["lon"] if p["lon"] is not None else np.nan for p in selected],
+                        dtype=float)
+        distances = self._haversine(place["lat"], place["lon"], lats, lons)
+        return bool(np.any(distances < self.DEDUPE_DISTANCE_M))
+
+    @staticmethod
+    def _normalize_name(name: str) -> str:
+        """Normalize a place name for duplicate detection"""
+        return re.sub(r"[\W_]+", " ", name.casefold()).strip()
+
+    @staticmethod
+    def _haversine(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        """Great-circle distances in meters from one point to many"""
+        lat1, lon1 = np.radians(lat), np.radians(lon)
+        lat2, lon2 = np.radians(lats), np.radians(lons)
+
+        a = np.sin((lat2 - lat1) / 2.0) ** 2 + \
+            np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+        return 2.0 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
 
     def _determine_category(self, tags: Dict[str, str]) -> str:
         """Determine the category of a place based on its tags"""
@@ -1,6 +1,10 @@
 import httpx
 from typing import Optional, Dict, Any
 import logging
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from ..services.tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -9,58 +13,108 @@ class WeatherAgent:
     """Agent responsible for fetching weather information"""
 
     BASE_URL = "https://api.open-meteo.com/v1"
+    FORECAST_DAYS = 2  # Today and tomorrow from a single call
 
     def __init__(self):
         self.session = httpx.AsyncClient(timeout=10.0)
 
-    async def get_weather(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
+    async def get_forecast(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
         """
-        Get current weather for given coordinates.
+        Get the hourly forecast series for given coordinates.
+
+        One call covers today and tomorrow, so callers can cache the result
+        and derive current conditions locally for every hour in the series.
 
         Args:
             lat: Latitude
             lon: Longitude
 
         Returns:
-            Dict with temperature and precipitation data or None if failed
+            Dict with hourly times, temperatures, precipitation probabilities,
+            unit and UTC offset, or None if failed
         """
         try:
             params = {
                 "latitude": lat,
                 "longitude": lon,
-                "current": "temperature_2m,precipitation_probability",
-                "hourly": "precipitation_probability",
+                "hourly": "temperature_2m,precipitation_probability",
                 "timezone": "auto",
-                "forecast_days": 1
+                "forecast_days": self.FORECAST_DAYS
             }
 
-            response = await self.session.get(
-                f"{self.BASE_URL}/forecast",
-                params=params
-            )
+            with span("weather.open_meteo") as trace_span:
+                response = await self.session.get(
+                    f"{self.BASE_URL}/forecast",
+                    params=params
+                )
+                trace_span.set(status=response.status_code,
+                               bytes=len(response.content))
+
+                if response.status_code == 200:
+                    data = response.json()
+                    hourly = data.get("hourly", {})
+
+                    times = hourly.get("time") or []
+                    if times:
+                        return {
+                            "time": times,
+                            "temperature": hourly.get("temperature_2m") or [],
+                            "precipitation_probability": hourly.get("precipitation_probability") or [],
+                            "unit": data.get("hourly_units", {}).get("temperature_2m", "°C"),
+                            "timezone": data.get("timezone", "UTC"),
+                            "utc_offset_seconds": data.get("utc_offset_seconds", 0)
+                        }
+
+            logger.warning("No weather data for coordinates: %s, %s", lat, lon)
+            return None
 
-            if response.status_code == 200:
-                data = response.json()
-                current = data.get("current", {})
+        except Exception as e:
+            logger.error("Weather API error for %s, %s: %s", lat, lon, e)
+            return None
 
-                temperature = current.get("temperature_2m")
-                precipitation_prob = current.get(
-                    "precipitation_probability", 0)
+    def get_conditions_at(self, forecast: Dict[str, Any], hours_ahead: int = 0,
+                          now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """
+        Derive conditions for a given hour from a cached forecast series.
 
-                if temperature is not None:
-                    return {
-                        "temperature": temperature,
-                        "precipitation_probability": precipitation_prob or 0,
-                        "unit": data.get("current_units", {}).get("temperature_2m", "°C")
-                    }
+        Args:
+            forecast: Result of get_forecast
+            hours_ahead: Offset from the current hour (0 for current conditions)
+            now: Reference time (defaults to the current UTC time)
 
-            logger.warning(f"No weather data for coordinates: {lat}, {lon}")
+        Returns:
+            Dict with temperature and precipitation data, or None if the
+            requested hour is not covered by the series
+        """
+        now = now or datetime.now(timezone.utc)
+        try:
+            # Resolve the offset for now, so a DST change since fetch is respected
+            local_now = now.astimezone(ZoneInfo(forecast.get("timezone") or "UTC"))
+        except (ZoneInfoNotFoundError, ValueError):
+            local_now = now.astimezone(timezone.utc) + \
+                timedelta(seconds=forecast.get("utc_offset_seconds", 0))
+        target = local_now.replace(minute=0, second=0, microsecond=0) + \
+            timedelta(hours=hours_ahead)
+
+        try:
+            index = forecast["time"].index(target.strftime("%Y-%m-%dT%H:%M"))
+            temperature = forecast["temperature"][index]
+        except (ValueError, IndexError, KeyError):
             return None
 
-        except Exception as e:
-            logger.error(f"Weather API error for {lat}, {lon}: {str(e)}")
+        if temperature is None:
             return None
 
+        precipitation = forecast["precipitation_probability"]
+        precipitation_prob = precipitation[index] if index < len(
+            precipitation) else 0
+
+        return {
+            "temperature": temperature,
+            "precipitation_probability": precipitation_prob or 0,
+            "unit": forecast.get("unit", "°C")
+        }
+
     def format_weather_response(self, weather_data: Dict[str, Any], location_name: str) -> str:
         """Format weather data into human-readable response"""
         temp = weather_data["temperature"]
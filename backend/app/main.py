@@ -1,14 +1,18 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import logging
 import asyncio
+from typing import Optional
 
 from .models import QueryRequest, QueryResponse
 from .agents.parent_agent import ParentAgent
+from .services import tracing
+from .services.log_pipeline import setup_logging, shutdown_logging
+from .services.sessions import SessionStore
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (queue-backed, formatted on a writer thread)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Create FastAPI app
@@ -27,9 +31,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Header values that enable X-Debug-Trace, matching the trace query bool
+TRUTHY_HEADER_VALUES = ("1", "true", "yes", "on")
+
 # Global parent agent instance
 parent_agent = ParentAgent()
 
+# Per-conversation state for follow-up questions
+session_store = SessionStore()
+
 
 @app.on_event("startup")
 async def startup_event():
@@ -42,6 +52,7 @@ async def shutdown_event():
     """Cleanup resources"""
     logger.info("Shutting down Multi-Agent Tourism API...")
     await parent_agent.close()
+    shutdown_logging()
 
 
 @app.get("/")
@@ -62,42 +73,71 @@ async def health_check():
 
 
 @app.post("/api/query", response_model=QueryResponse)
-async def process_query(request: QueryRequest):
+async def process_query(request: QueryRequest,
+                        trace: bool = Query(False),
+                        x_debug_trace: Optional[str] = Header(None)):
     """
     Process a travel-related query using the multi-agent system.
 
     Args:
-        request: QueryRequest containing the user's message
+        request: QueryRequest containing the user's message and optional
+            session_id ("new" to start a conversation, or the id from a
+            previous response); without it the query is stateless
+        trace: Return the request's timing trace in the response
+        x_debug_trace: Header alternative to the trace query parameter
 
     Returns:
         QueryResponse with the agent's reply and structured data
     """
+    debug_trace = trace or (x_debug_trace or "").strip().lower() in TRUTHY_HEADER_VALUES
+    sampled = tracing.should_sample()
+    request_trace = tracing.start_trace() if debug_trace or sampled else None
+
     try:
         if not request.message.strip():
             raise HTTPException(
                 status_code=400, detail="Message cannot be empty")
 
-        logger.info(f"Processing query: {request.message}")
+        logger.info("Processing query: %.100s", request.message)
+
+        session_id, session = None, None
+        if request.session_id:
+            session_id, session = session_store.get_or_create(request.session_id)
 
         # Process the query using the parent agent
-        result = await parent_agent.process_query(request.message)
+        result = await parent_agent.process_query(request.message, session)
 
         # Create response
         response = QueryResponse(
             reply=result["reply"],
             location_info=result["location_info"],
             weather_data=result["weather_data"],
-            places_data=result["places_data"]
+            places_data=result["places_data"],
+            session_id=session_id
         )
 
-        logger.info(f"Query processed successfully")
+        if request_trace is not None:
+            request_trace.finish()
+            if debug_trace:
+                response.trace = request_trace.to_dict()
+
+        logger.info("Query processed successfully")
         return response
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error processing query: {str(e)}")
+        logger.error("Error processing query: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
+    finally:
+        if request_trace is not None:
+            tracing.end_trace()
+            if sampled:
+                if request_trace.duration_ms is None:
+                    request_trace.finish()
+                # Write off the event loop, without delaying the response
+                asyncio.get_running_loop().run_in_executor(
+                    None, tracing.write_trace, request_trace)
 
 
 @app.get("/api/stats")
@@ -105,6 +145,7 @@ async def get_stats():
     """Get basic statistics about the API usage"""
     return {
         "cache_size": len(parent_agent.cache),
+        "active_sessions": len(session_store),
         "status": "operational"
     }
 
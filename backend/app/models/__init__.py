@@ -5,6 +5,7 @@ from typing import Optional, List, Dict
 class QueryRequest(BaseModel):
     message: str
     preferences: Optional[Dict[str, str]] = {"language": "en"}
+    session_id: Optional[str] = None
 
 
 class QueryResponse(BaseModel):
@@ -12,6 +13,8 @@ class QueryResponse(BaseModel):
     location_info: Optional[dict] = None
     weather_data: Optional[dict] = None
     places_data: Optional[List[dict]] = None
+    trace: Optional[dict] = None
+    session_id: Optional[str] = None
 
 
 class WeatherData(BaseModel):
@@ -3,6 +3,8 @@ import asyncio
 from typing import Optional, Dict, Any
 import logging
 
+from .tracing import span
+
 logger = logging.getLogger(__name__)
 
 
@@ -36,27 +38,30 @@ class GeocodingService:
                 "addressdetails": 1
             }
 
-            response = await self.session.get(
-                f"{self.BASE_URL}/search",
-                params=params
-            )
-
-            if response.status_code == 200:
-                data = response.json()
-                if data and len(data) > 0:
-                    result = data[0]
-                    return {
-                        "lat": float(result["lat"]),
-                        "lon": float(result["lon"]),
-                        "display_name": result.get("display_name", ""),
-                        "country": result.get("address", {}).get("country", "")
-                    }
-
-            logger.warning(f"No geocoding results for: {place_name}")
+            with span("geocoding.nominatim", query=place_name[:100]) as trace_span:
+                response = await self.session.get(
+                    f"{self.BASE_URL}/search",
+                    params=params
+                )
+                trace_span.set(status=response.status_code,
+                               bytes=len(response.content))
+
+                if response.status_code == 200:
+                    data = response.json()
+                    if data and len(data) > 0:
+                        result = data[0]
+                        return {
+                            "lat": float(result["lat"]),
+                            "lon": float(result["lon"]),
+                            "display_name": result.get("display_name", ""),
+                            "country": result.get("address", {}).get("country", "")
+                        }
+
+            logger.warning("No geocoding results for: %s", place_name)
             return None
 
         except Exception as e:
-            logger.error(f"Geocoding error for {place_name}: {str(e)}")
+            logger.error("Geocoding error for %s: %s", place_name, e)
             return None
 
     async def close(self):
@@ -0,0 +1,234 @@
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Logging configuration
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()  # "text" or "json"
+# App records allowed per logger and message template each interval (0 disables)
+LOG_RATE_LIMIT = int(os.getenv("LOG_RATE_LIMIT", "20"))
+LOG_RATE_INTERVAL = float(os.getenv("LOG_RATE_INTERVAL", "1.0"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Seconds between reports of rate-limited and dropped records
+LOG_REPORT_INTERVAL = float(os.getenv("LOG_REPORT_INTERVAL", "60"))
+
+TEXT_FORMAT = "%(levelname)s:%(name)s:%(message)s"
+# Loggers configured by uvicorn with their own synchronous handlers
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.access")
+# Only the application's own loggers are rate limited; access logs are kept
+RATE_LIMITED_LOGGERS = ("app",)
+# Argument types copied at log time so later mutation doesn't change the line
+MUTABLE_ARG_TYPES = (dict, list, set, bytearray)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that never formats or blocks on the calling thread.
+
+    Message formatting happens on the writer thread, and records are dropped
+    rather than waiting when the queue is full. Top-level dict, list and set
+    arguments are shallow-copied at log time; deeper mutable state should be
+    formatted by the caller.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if isinstance(args, tuple):
+            if any(isinstance(arg, MUTABLE_ARG_TYPES) for arg in args):
+                record.args = tuple(copy.copy(arg) if isinstance(arg, MUTABLE_ARG_TYPES) else arg
+                                    for arg in args)
+        elif isinstance(args, dict):
+            record.args = {key: copy.copy(value) if isinstance(value, MUTABLE_ARG_TYPES) else value
+                           for key, value in args.items()}
+        return record
+
+    def pop_dropped(self) -> int:
+        """Return and reset the number of records dropped on a full queue"""
+        with self.lock:
+            dropped, self.dropped = self.dropped, 0
+        return dropped
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drop repetitive records below WARNING once a logger exceeds its budget.
+
+    Records are keyed by logger name and unformatted message template, so
+    "Processing query: %s" is limited as one message whatever the query.
+    Only loggers under the given prefixes are limited.
+    """
+
+    def __init__(self, limit: int, interval: float = 1.0,
+                 prefixes: Tuple[str, ...] = RATE_LIMITED_LOGGERS):
+        super().__init__()
+        self.limit = limit
+        self.interval = interval
+        self.prefixes = prefixes
+        self.suppressed = 0
+        self._windows: Dict[Tuple[str, str], Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.limit <= 0 or record.levelno >= logging.WARNING:
+            return True
+        if not any(record.name == prefix or record.name.startswith(prefix + ".")
+                   for prefix in self.prefixes):
+            return True
+
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window_start, count = self._windows.get(key, (now, 0))
+            if now - window_start >= self.interval:
+                window_start, count = now, 0
+            self._windows[key] = (window_start, count + 1)
+            if count >= self.limit:
+                self.suppressed += 1
+                return False
+        return True
+
+    def pop_suppressed(self) -> int:
+        """Return and reset the number of rate-limited records"""
+        with self._lock:
+            suppressed, self.suppressed = self.suppressed, 0
+        return suppressed
+
+
+class LossReporter:
+    """
+    Periodically log how many records were rate limited or dropped.
+
+    Reports are written straight to the output handler from a daemon thread,
+    so they are never themselves limited or lost to a full queue.
+    """
+
+    def __init__(self, rate_filter: RateLimitFilter, queue_handler: NonBlockingQueueHandler,
+                 output: logging.Handler, interval: float):
+        self.rate_filter = rate_filter
+        self.queue_handler = queue_handler
+        self.output = output
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="log-loss-reporter", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.report()
+
+    def report(self) -> None:
+        parts: List[str] = []
+        suppressed = self.rate_filter.pop_suppressed()
+        if suppressed:
+            parts.append(f"suppressed {suppressed} rate-limited records")
+        dropped = self.queue_handler.pop_dropped()
+        if dropped:
+            parts.append(f"dropped {dropped} records on a full queue")
+        if parts:
+            self.output.handle(logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0, "Logging %s", ("; ".join(parts),), None))
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.report()
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_reporter: Optional[LossReporter] = None
+
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """
+    Route all logging through a bounded queue drained by a writer thread.
+
+    Replaces logging.basicConfig so slow stdout or disks never block the
+    event loop. Safe to call more than once.
+    """
+    global _listener, _reporter
+    if _listener is not None:
+        return _listener
+
+    stream_handler = logging.StreamHandler()
+    if LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    rate_filter = RateLimitFilter(LOG_RATE_LIMIT, LOG_RATE_INTERVAL)
+    queue_handler.addFilter(rate_filter)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(LOG_LEVEL)
+
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        for handler in list(uvicorn_logger.handlers):
+            uvicorn_logger.removeHandler(handler)
+        uvicorn_logger.propagate = True
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    _reporter = LossReporter(rate_filter, queue_handler, stream_handler, LOG_REPORT_INTERVAL)
+    _reporter.start()
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """
+    Flush queued records and stop the writer and reporter threads.
+
+    The root logger is switched to the output handler first, so records
+    logged during and after teardown (e.g. uvicorn's shutdown lines) are
+    written synchronously instead of landing in a queue nobody drains.
+    """
+    global _listener, _reporter
+    if _reporter is not None:
+        root = logging.getLogger()
+        root.removeHandler(_reporter.queue_handler)
+        root.addHandler(_reporter.output)
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _reporter is not None:
+        _reporter.stop()
+        _reporter = None
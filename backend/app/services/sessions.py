@@ -0,0 +1,55 @@
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+
+NEW_SESSION = "new"
+
+
+class SessionStore:
+    """
+    Bounded in-memory store of per-conversation state.
+
+    Sessions are evicted after sitting idle for idle_ttl, and the least
+    recently used session is dropped once max_sessions is reached.
+    """
+
+    def __init__(self, max_sessions: int = 1000, idle_ttl: timedelta = timedelta(minutes=30)):
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._sessions: "OrderedDict[str, Tuple[Dict[str, Any], datetime]]" = OrderedDict()
+
+    def get_or_create(self, session_id: Optional[str]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Get the state for a session, starting a new one if it is unknown or expired.
+
+        Clients opt in by sending NEW_SESSION; ids are always issued here.
+
+        Returns:
+            Tuple of the (possibly new) session id and its mutable state dict
+        """
+        now = datetime.now()
+        self._evict_idle(now)
+
+        if session_id and session_id != NEW_SESSION and session_id in self._sessions:
+            state, _ = self._sessions.pop(session_id)
+        else:
+            session_id = uuid.uuid4().hex
+            state = {}
+            while len(self._sessions) >= self.max_sessions:
+                self._sessions.popitem(last=False)
+
+        self._sessions[session_id] = (state, now)
+        return session_id, state
+
+    def _evict_idle(self, now: datetime) -> None:
+        """Drop sessions idle for longer than idle_ttl (oldest first)"""
+        while self._sessions:
+            _, (_, last_seen) = next(iter(self._sessions.items()))
+            if now - last_seen < self.idle_ttl:
+                break
+            self._sessions.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -0,0 +1,140 @@
+import contextvars
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Fraction of requests whose trace is appended to TRACE_FILE (0 disables sampling)
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar(
+    "current_trace", default=None)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "current_span", default=None)
+
+
+class Span:
+    """A timed section of a request with free-form attributes"""
+
+    __slots__ = ("trace", "name", "attributes", "parent", "start", "duration_ms", "_token")
+
+    def __init__(self, trace: "Trace", name: str, attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.attributes = attributes
+        self.parent: Optional[str] = None
+        self.start = 0.0
+        self.duration_ms: Optional[float] = None
+        self._token = None
+
+    def set(self, **attributes: Any) -> None:
+        """Attach attributes such as cache, status, bytes or retries"""
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        parent = _current_span.get()
+        self.parent = parent.name if parent is not None else None
+        self.start = time.perf_counter()
+        self._token = _current_span.set(self)
+        self.trace.spans.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.duration_ms = (time.perf_counter() - self.start) * 1000
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        _current_span.reset(self._token)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "parent": self.parent,
+            "start_ms": round((self.start - self.trace.start) * 1000, 3),
+            "duration_ms": round(self.duration_ms, 3) if self.duration_ms is not None else None,
+            **self.attributes
+        }
+
+
+class _NoopSpan:
+    """Span returned when no trace is active; every operation is a no-op"""
+
+    __slots__ = ()
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """Collects the spans recorded while processing a single request"""
+
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex
+        self.start = time.perf_counter()
+        self.spans: List[Span] = []
+        self.duration_ms: Optional[float] = None
+
+    def finish(self) -> None:
+        self.duration_ms = (time.perf_counter() - self.start) * 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "duration_ms": round(self.duration_ms, 3) if self.duration_ms is not None else None,
+            "spans": [span.to_dict() for span in self.spans]
+        }
+
+
+def span(name: str, **attributes: Any):
+    """
+    Open a span in the current trace.
+
+    Returns a shared no-op span when tracing is not active, so instrumented
+    code costs a single context variable lookup per call.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return Span(trace, name, attributes)
+
+
+def should_sample() -> bool:
+    """Decide whether the current request's trace goes to TRACE_FILE"""
+    return TRACE_SAMPLE_RATE > 0 and random.random() < TRACE_SAMPLE_RATE
+
+
+def start_trace() -> Trace:
+    """Start collecting spans for the current request context"""
+    trace = Trace()
+    _current_trace.set(trace)
+    _current_span.set(None)
+    return trace
+
+
+def end_trace() -> None:
+    """Stop collecting spans for the current request context"""
+    _current_trace.set(None)
+    _current_span.set(None)
+
+
+def write_trace(trace: Trace) -> None:
+    """Append a finished trace to TRACE_FILE as one JSON line"""
+    try:
+        with open(TRACE_FILE, "a", encoding="utf-8") as trace_file:
+            trace_file.write(json.dumps(trace.to_dict()) + "\n")
+    except OSError as e:
+        logger.error("Failed to write trace %s: %s", trace.trace_id, e)
@@ -150,6 +150,7 @@ function App() {
                 data: null
             }
         ]);
+        apiService.resetSession();
         setError(null);
     };
 
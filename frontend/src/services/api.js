@@ -3,6 +3,7 @@ const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 class ApiService {
     constructor() {
         this.keepAliveInterval = null;
+        this.sessionId = null;
         this.startKeepAlive();
     }
 
@@ -24,6 +25,11 @@ class ApiService {
             this.keepAliveInterval = null;
         }
     }
+    resetSession() {
+        // Start a new conversation; follow-ups no longer refer to earlier places
+        this.sessionId = null;
+    }
+
     async sendQuery(message, settings = {}) {
         try {
             const controller = new AbortController();
@@ -36,7 +42,8 @@ class ApiService {
                 },
                 body: JSON.stringify({
                     message,
-                    preferences: settings
+                    preferences: settings,
+                    session_id: this.sessionId || 'new'
                 }),
                 signal: controller.signal
             });
@@ -48,7 +55,9 @@ class ApiService {
                 throw new Error(errorData.detail || `HTTP error! status: ${response.status}`);
             }
 
-            return await response.json();
+            const data = await response.json();
+            this.sessionId = data.session_id || null;
+            return data;
         } catch (error) {
             if (error.name === 'AbortError') {
                 throw new Error('Request timeout - backend may be sleeping, please try again');